@@ -0,0 +1,449 @@
+"""API FastAPI para explorar y filtrar la base de datos de BINs."""
+from __future__ import annotations
+
+import hashlib
+import io
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from fastapi import FastAPI, File, HTTPException, Query, Request, UploadFile
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - dependencia opcional
+    pa = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - dependencia opcional
+    msgpack = None
+
+from .utils import (
+    LIST_DIMS,
+    apply_filters,
+    build_bin_index,
+    build_bin_int,
+    build_first_occurrence,
+    build_prepaid_bool,
+    build_search_blob,
+    categorize_columns,
+    detect_columns,
+    filter_mask,
+    read_csv,
+)
+
+DATA_PATH = Path(__file__).resolve().parent.parent / "bin-list-data.csv"
+
+# Cache de parseos de uploads: hash del contenido -> (df, encoding, mapping,
+# índice de BIN). Evita re-parsear cuando se sube el mismo fichero varias veces.
+_PARSE_CACHE: OrderedDict[bytes, tuple] = OrderedDict()
+_PARSE_CACHE_MAX = 4
+
+# Cache de filtrados: (versión de datos, parámetros de filtro) -> posiciones
+# de fila. Paginar sobre el mismo filtro no vuelve a filtrar.
+_FILTER_CACHE: OrderedDict[tuple, np.ndarray] = OrderedDict()
+_FILTER_CACHE_MAX = 32
+
+# Cache de exports serializados: (versión, filtros, columnas) -> bytes CSV.
+# Descargar dos veces el mismo filtro no vuelve a serializar.
+_EXPORT_CACHE: OrderedDict[tuple, bytes] = OrderedDict()
+_EXPORT_CACHE_MAX_BYTES = 200 * 1024 * 1024
+
+
+@dataclass
+class DataStore:
+    """Estado en memoria: el CSV cargado y su mapeo de columnas."""
+
+    df: Optional[pd.DataFrame] = None
+    encoding: Optional[str] = None
+    mapping: dict = field(default_factory=dict)
+    source: str = ""
+    version: int = 0
+    bin_index: Optional[tuple] = None
+    bin_int: Optional[tuple] = None
+    search_blob: Optional[pd.Series] = None
+    prepaid_bool: Optional[pd.Series] = None
+    first_occurrence: Optional[np.ndarray] = None
+    options: dict = field(default_factory=dict)
+
+    def refresh_derived(self) -> None:
+        """Reconstruye las estructuras derivadas del df/mapeo actual."""
+        bin_col = self.mapping.get("bin")
+        self.bin_index = build_bin_index(self.df, bin_col) if bin_col else None
+        self.bin_int = build_bin_int(self.df, bin_col) if bin_col else None
+        self.search_blob = build_search_blob(self.df)
+        prepaid_col = self.mapping.get("prepaid")
+        self.prepaid_bool = (
+            build_prepaid_bool(self.df, prepaid_col) if prepaid_col else None
+        )
+        self.first_occurrence = (
+            build_first_occurrence(self.df, bin_col) if bin_col else None
+        )
+        self.options = {}
+        for dim, col in self.mapping.items():
+            if not col or dim == "bin":
+                continue
+            if isinstance(self.df[col].dtype, pd.CategoricalDtype):
+                self.options[dim] = sorted(self.df[col].cat.categories.tolist())
+            else:
+                self.options[dim] = sorted(self.df[col].dropna().unique().tolist())
+
+
+STORE = DataStore()
+
+app = FastAPI(title="BIN Database Filter")
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+
+def load_default() -> None:
+    """Carga el CSV incluido en el repo, si existe."""
+    if not DATA_PATH.exists():
+        return
+    STORE.df, STORE.encoding = read_csv(str(DATA_PATH))
+    STORE.mapping = detect_columns(STORE.df)
+    categorize_columns(STORE.df, STORE.mapping)
+    STORE.refresh_derived()
+    STORE.source = DATA_PATH.name
+
+
+load_default()
+
+
+def _require_df() -> pd.DataFrame:
+    if STORE.df is None:
+        raise HTTPException(status_code=400, detail="No hay ningún CSV cargado")
+    return STORE.df
+
+
+def _collect_lists(params: dict[str, Optional[list[str]]]) -> dict[str, list[str]]:
+    return {dim: values for dim, values in params.items() if values}
+
+
+def _filtered_positions(prefix, text, include, exclude, prepaid, dedupe) -> np.ndarray:
+    """Posiciones de fila que pasan los filtros, cacheadas por filtro."""
+    df = _require_df()
+    key = (
+        STORE.version,
+        prefix,
+        text,
+        tuple(sorted((dim, tuple(vals)) for dim, vals in include.items())),
+        tuple(sorted((dim, tuple(vals)) for dim, vals in exclude.items())),
+        prepaid,
+        dedupe,
+    )
+    positions = _FILTER_CACHE.get(key)
+    if positions is None:
+        mask = filter_mask(
+            df,
+            STORE.mapping,
+            prefix=prefix,
+            text=text,
+            include=include,
+            exclude=exclude,
+            prepaid=prepaid,
+            dedupe=dedupe,
+            bin_index=STORE.bin_index,
+            bin_int=STORE.bin_int,
+            search_blob=STORE.search_blob,
+            prepaid_bool=STORE.prepaid_bool,
+            first_occurrence=STORE.first_occurrence,
+        )
+        positions = np.flatnonzero(mask)
+        _FILTER_CACHE[key] = positions
+        while len(_FILTER_CACHE) > _FILTER_CACHE_MAX:
+            _FILTER_CACHE.popitem(last=False)
+    else:
+        _FILTER_CACHE.move_to_end(key)
+    return positions
+
+
+def _iter_csv(df: pd.DataFrame, chunk: int = 10_000):
+    """Serializa el DataFrame a CSV por bloques, sin materializarlo entero."""
+    yield df.iloc[:0].to_csv(index=False).encode("utf-8")
+    for start in range(0, len(df), chunk):
+        yield df.iloc[start : start + chunk].to_csv(index=False, header=False).encode("utf-8")
+
+
+def _store_export(key: tuple, payload: bytes) -> None:
+    if len(payload) > _EXPORT_CACHE_MAX_BYTES:
+        return
+    _EXPORT_CACHE[key] = payload
+    while sum(len(v) for v in _EXPORT_CACHE.values()) > _EXPORT_CACHE_MAX_BYTES:
+        _EXPORT_CACHE.popitem(last=False)
+
+
+def _iter_csv_caching(df: pd.DataFrame, key: tuple):
+    """Como `_iter_csv`, pero guarda los bytes completos al terminar de emitir."""
+    chunks: list[bytes] = []
+    for chunk in _iter_csv(df):
+        chunks.append(chunk)
+        yield chunk
+    _store_export(key, b"".join(chunks))
+
+
+def _binary_response(data: pd.DataFrame, total: int, page: int, page_size: int, accept: str):
+    """Respuesta columnar binaria para /bins si el cliente la acepta.
+
+    Con Arrow IPC los buffers de columnas se copian tal cual al socket;
+    con msgpack se evita igualmente el dict por fila y la cadena JSON.
+    Devuelve None si el cliente solo acepta JSON.
+    """
+    meta = {"total": total, "page": page, "page_size": page_size}
+    if pa is not None and "application/vnd.apache.arrow.stream" in accept:
+        table = pa.Table.from_pandas(data, preserve_index=False)
+        table = table.replace_schema_metadata({k: str(v) for k, v in meta.items()})
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return Response(
+            content=sink.getvalue().to_pybytes(),
+            media_type="application/vnd.apache.arrow.stream",
+        )
+    if msgpack is not None and "application/msgpack" in accept:
+        body = msgpack.packb(
+            {
+                **meta,
+                "columns": list(data.columns),
+                "data": [
+                    data[col].astype(object).where(data[col].notna(), None).tolist()
+                    for col in data.columns
+                ],
+            },
+            use_bin_type=True,
+        )
+        return Response(content=body, media_type="application/msgpack")
+    return None
+
+
+@app.post("/upload")
+async def upload_csv(file: UploadFile = File(...)):
+    """Carga un CSV subido por el usuario y detecta sus columnas."""
+    content = await file.read()
+    if not content:
+        raise HTTPException(status_code=400, detail="Fichero vacío")
+    key = hashlib.blake2b(content, digest_size=16).digest()
+    cached = _PARSE_CACHE.get(key)
+    if cached is not None:
+        _PARSE_CACHE.move_to_end(key)
+        (
+            STORE.df,
+            STORE.encoding,
+            mapping,
+            STORE.bin_index,
+            STORE.bin_int,
+            STORE.search_blob,
+            STORE.prepaid_bool,
+            STORE.first_occurrence,
+            STORE.options,
+        ) = cached
+        # Copia: /mapping muta STORE.mapping in situ y no debe envenenar
+        # la entrada cacheada (que guarda el mapeo autodetectado).
+        STORE.mapping = dict(mapping)
+    else:
+        try:
+            df, encoding = read_csv(io.BytesIO(content))
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+        mapping = detect_columns(df)
+        categorize_columns(df, mapping)
+        STORE.df, STORE.encoding, STORE.mapping = df, encoding, mapping
+        STORE.refresh_derived()
+        _PARSE_CACHE[key] = (
+            df,
+            encoding,
+            dict(mapping),
+            STORE.bin_index,
+            STORE.bin_int,
+            STORE.search_blob,
+            STORE.prepaid_bool,
+            STORE.first_occurrence,
+            STORE.options,
+        )
+        while len(_PARSE_CACHE) > _PARSE_CACHE_MAX:
+            _PARSE_CACHE.popitem(last=False)
+    STORE.source = file.filename or "upload"
+    STORE.version += 1
+    return {
+        "rows": len(STORE.df),
+        "columns": list(STORE.df.columns),
+        "mapping": STORE.mapping,
+        "encoding": STORE.encoding,
+    }
+
+
+@app.get("/meta")
+def meta():
+    """Devuelve el mapeo detectado y los valores disponibles por dimensión."""
+    df = _require_df()
+    return {
+        "rows": len(df),
+        "columns": list(df.columns),
+        "mapping": STORE.mapping,
+        "source": STORE.source,
+        "options": STORE.options,
+    }
+
+
+@app.post("/mapping")
+def set_mapping(mapping: dict[str, Optional[str]]):
+    """Permite corregir a mano el mapeo dimensión -> columna."""
+    df = _require_df()
+    for dim, col in mapping.items():
+        if dim not in STORE.mapping:
+            raise HTTPException(status_code=400, detail=f"Dimensión desconocida: {dim}")
+        if col is not None and col not in df.columns:
+            raise HTTPException(status_code=400, detail=f"Columna desconocida: {col}")
+        STORE.mapping[dim] = col
+    categorize_columns(df, STORE.mapping)
+    STORE.refresh_derived()
+    STORE.version += 1
+    return {"mapping": STORE.mapping}
+
+
+@app.get("/bins")
+def bins_list(
+    request: Request,
+    prefix: Optional[str] = None,
+    text: Optional[str] = None,
+    include_bank: Optional[list[str]] = Query(None),
+    exclude_bank: Optional[list[str]] = Query(None),
+    include_brand: Optional[list[str]] = Query(None),
+    exclude_brand: Optional[list[str]] = Query(None),
+    include_type: Optional[list[str]] = Query(None),
+    exclude_type: Optional[list[str]] = Query(None),
+    include_level: Optional[list[str]] = Query(None),
+    exclude_level: Optional[list[str]] = Query(None),
+    include_country: Optional[list[str]] = Query(None),
+    exclude_country: Optional[list[str]] = Query(None),
+    include_country_code: Optional[list[str]] = Query(None),
+    exclude_country_code: Optional[list[str]] = Query(None),
+    prepaid: Optional[bool] = None,
+    dedupe: bool = False,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(50, ge=1, le=1000),
+    columns: Optional[list[str]] = Query(None),
+):
+    """Lista paginada de BINs con los filtros aplicados."""
+    df = _require_df()
+    include = _collect_lists(
+        {
+            "bank": include_bank,
+            "brand": include_brand,
+            "type": include_type,
+            "level": include_level,
+            "country": include_country,
+            "country_code": include_country_code,
+        }
+    )
+    exclude = _collect_lists(
+        {
+            "bank": exclude_bank,
+            "brand": exclude_brand,
+            "type": exclude_type,
+            "level": exclude_level,
+            "country": exclude_country,
+            "country_code": exclude_country_code,
+        }
+    )
+    positions = _filtered_positions(prefix, text, include, exclude, prepaid, dedupe)
+    total = len(positions)
+    start = (page - 1) * page_size
+    data = df.iloc[positions[start : start + page_size]]
+    if columns:
+        missing = [c for c in columns if c not in data.columns]
+        if missing:
+            raise HTTPException(status_code=400, detail=f"Columnas desconocidas: {missing}")
+        data = data[columns]
+    binary = _binary_response(
+        data, total, page, page_size, request.headers.get("accept", "")
+    )
+    if binary is not None:
+        return binary
+    return {
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+        "data": data.where(data.notna(), None).to_dict(orient="records"),
+    }
+
+
+@app.get("/bins/export")
+def bins_export(
+    prefix: Optional[str] = None,
+    text: Optional[str] = None,
+    include_bank: Optional[list[str]] = Query(None),
+    exclude_bank: Optional[list[str]] = Query(None),
+    include_brand: Optional[list[str]] = Query(None),
+    exclude_brand: Optional[list[str]] = Query(None),
+    include_type: Optional[list[str]] = Query(None),
+    exclude_type: Optional[list[str]] = Query(None),
+    include_level: Optional[list[str]] = Query(None),
+    exclude_level: Optional[list[str]] = Query(None),
+    include_country: Optional[list[str]] = Query(None),
+    exclude_country: Optional[list[str]] = Query(None),
+    include_country_code: Optional[list[str]] = Query(None),
+    exclude_country_code: Optional[list[str]] = Query(None),
+    prepaid: Optional[bool] = None,
+    dedupe: bool = False,
+    columns: Optional[list[str]] = Query(None),
+):
+    """Exporta el resultado filtrado como CSV."""
+    df = _require_df()
+    include = _collect_lists(
+        {
+            "bank": include_bank,
+            "brand": include_brand,
+            "type": include_type,
+            "level": include_level,
+            "country": include_country,
+            "country_code": include_country_code,
+        }
+    )
+    exclude = _collect_lists(
+        {
+            "bank": exclude_bank,
+            "brand": exclude_brand,
+            "type": exclude_type,
+            "level": exclude_level,
+            "country": exclude_country,
+            "country_code": exclude_country_code,
+        }
+    )
+    headers = {"Content-Disposition": "attachment; filename=bins_filtrados.csv"}
+    key = (
+        STORE.version,
+        prefix,
+        text,
+        tuple(sorted((dim, tuple(vals)) for dim, vals in include.items())),
+        tuple(sorted((dim, tuple(vals)) for dim, vals in exclude.items())),
+        prepaid,
+        dedupe,
+        tuple(columns) if columns else None,
+    )
+    payload = _EXPORT_CACHE.get(key)
+    if payload is not None:
+        _EXPORT_CACHE.move_to_end(key)
+        return StreamingResponse(io.BytesIO(payload), media_type="text/csv", headers=headers)
+    positions = _filtered_positions(prefix, text, include, exclude, prepaid, dedupe)
+    filtered = df.iloc[positions]
+    if columns:
+        missing = [c for c in columns if c not in filtered.columns]
+        if missing:
+            raise HTTPException(status_code=400, detail=f"Columnas desconocidas: {missing}")
+        filtered = filtered[columns]
+    return StreamingResponse(
+        _iter_csv_caching(filtered, key),
+        media_type="text/csv",
+        headers=headers,
+    )
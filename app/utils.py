@@ -0,0 +1,478 @@
+"""Utilidades para cargar, mapear y filtrar bases de datos de BINs/IINs."""
+from __future__ import annotations
+
+import io
+import re
+import unicodedata
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    import charset_normalizer
+except ImportError:  # pragma: no cover - dependencia opcional
+    charset_normalizer = None
+
+try:
+    import ahocorasick
+except ImportError:  # pragma: no cover - dependencia opcional
+    ahocorasick = None
+
+try:
+    import numba
+except ImportError:  # pragma: no cover - dependencia opcional
+    numba = None
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - dependencia opcional
+    pa = None
+
+# Codificaciones habituales en exports de BINs, en orden de probabilidad.
+ENCODINGS = ("utf-8", "utf-8-sig", "latin-1", "cp1252")
+
+# Bytes de muestra para la heurística de detección de codificación.
+_ENCODING_SAMPLE = 65536
+
+# Dimensiones lógicas -> posibles nombres de columna (ya normalizados).
+COLUMN_SYNONYMS: dict[str, list[str]] = {
+    "bin": ["bin", "iin", "biniin", "numero"],
+    "bank": ["issuer", "bank", "banco", "emisor", "entidad"],
+    "brand": ["brand", "marca", "scheme", "network", "franquicia"],
+    "type": ["type", "tipo"],
+    "level": ["category", "level", "nivel", "categoria", "segmento"],
+    "country": ["countryname", "country", "pais"],
+    "country_code": ["isocode2", "countrycode", "codigopais"],
+    "prepaid": ["prepaid", "prepago"],
+}
+
+# Lookup compilado una sola vez: nombre exacto -> dimensión, y una alternación
+# por dimensión para coincidencias parciales. Evita el bucle anidado
+# columnas × sinónimos en cada `detect_columns`.
+_EXACT = {syn: dim for dim, syns in COLUMN_SYNONYMS.items() for syn in syns}
+_PARTIAL_RE = {
+    dim: re.compile("|".join(map(re.escape, syns)))
+    for dim, syns in COLUMN_SYNONYMS.items()
+}
+
+# Dimensiones que se filtran con listas include/exclude.
+LIST_DIMS = ("bank", "brand", "type", "level", "country", "country_code")
+
+# Dimensiones de baja cardinalidad que conviene almacenar como `category`.
+# `bin` se queda como texto: cardinalidad alta y se filtra por prefijo.
+CATEGORICAL_DIMS = LIST_DIMS + ("prepaid",)
+
+TRUE_VALUES = {"yes", "y", "true", "1", "si", "sí"}
+FALSE_VALUES = {"no", "n", "false", "0"}
+
+
+def normalize_name(name: str) -> str:
+    """Normaliza un nombre de columna: sin acentos, minúsculas, solo alfanumérico."""
+    text = unicodedata.normalize("NFKD", str(name))
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return "".join(ch for ch in text.lower() if ch.isalnum())
+
+
+def _detect_encoding(path_or_buffer) -> Optional[str]:
+    """Detecta la codificación sobre una muestra inicial, si hay detector."""
+    if charset_normalizer is None:
+        return None
+    if isinstance(path_or_buffer, io.BytesIO):
+        sample = path_or_buffer.getvalue()[:_ENCODING_SAMPLE]
+        path_or_buffer.seek(0)
+    elif isinstance(path_or_buffer, str):
+        with open(path_or_buffer, "rb") as handle:
+            sample = handle.read(_ENCODING_SAMPLE)
+    else:
+        return None
+    best = charset_normalizer.from_bytes(sample).best()
+    if best is None:
+        return None
+    # Solo nos fiamos de la detección si cae en las codificaciones conocidas;
+    # una detección exótica que decodifica "bien" produciría mojibake.
+    encoding = best.encoding.replace("_", "-").lower()
+    if encoding == "ascii":
+        return "utf-8"
+    return encoding if encoding in ENCODINGS else None
+
+
+def read_csv(path_or_buffer) -> tuple[pd.DataFrame, str]:
+    """Lee un CSV probando varias codificaciones.
+
+    Si charset-normalizer está instalado, la codificación se detecta una vez
+    sobre una muestra y el fichero se parsea una sola vez; el bucle de
+    codificaciones queda como red de seguridad.
+    Intenta primero el parser multihilo de pyarrow (las columnas de texto
+    comparten un único buffer contiguo); si pyarrow no está instalado o no
+    puede con el fichero, cae al parser C por defecto, con `memory_map`
+    cuando se lee desde un path.
+    Devuelve el DataFrame (todas las columnas como texto) y la codificación
+    con la que se consiguió leer.
+    """
+    detected = _detect_encoding(path_or_buffer)
+    candidates = ENCODINGS
+    if detected is not None:
+        candidates = (detected,) + tuple(e for e in ENCODINGS if e != detected)
+    last_error: Optional[Exception] = None
+    for engine_kwargs in ({"engine": "pyarrow", "dtype_backend": "pyarrow"}, {}):
+        if not engine_kwargs and isinstance(path_or_buffer, str):
+            engine_kwargs = {"memory_map": True}
+        for encoding in candidates:
+            try:
+                if isinstance(path_or_buffer, io.BytesIO):
+                    path_or_buffer.seek(0)
+                df = pd.read_csv(
+                    path_or_buffer, dtype="string", encoding=encoding, **engine_kwargs
+                )
+                return df, encoding
+            except ImportError:
+                break
+            except Exception as exc:  # noqa: BLE001 - el parser lanza de todo
+                last_error = exc
+    raise ValueError(f"No se pudo leer el CSV: {last_error}")
+
+
+def detect_columns(df: pd.DataFrame) -> dict[str, Optional[str]]:
+    """Detecta qué columna del CSV corresponde a cada dimensión lógica.
+
+    Primera pasada: coincidencias exactas de nombre. Segunda pasada: solo
+    para las dimensiones aún sin mapear, coincidencia parcial con la
+    alternación precompilada.
+    """
+    normalized = {col: normalize_name(col) for col in df.columns}
+    mapping: dict[str, Optional[str]] = {dim: None for dim in COLUMN_SYNONYMS}
+    for col, norm in normalized.items():
+        dim = _EXACT.get(norm)
+        if dim is not None and mapping[dim] is None:
+            mapping[dim] = col
+    for dim, pattern in _PARTIAL_RE.items():
+        if mapping[dim] is not None:
+            continue
+        for col, norm in normalized.items():
+            if pattern.search(norm):
+                mapping[dim] = col
+                break
+    return mapping
+
+
+def categorize_columns(df: pd.DataFrame, mapping: dict[str, Optional[str]]) -> None:
+    """Convierte las columnas de baja cardinalidad a dtype `category` in situ.
+
+    Con `category`, los `.isin` de los filtros comparan códigos enteros en
+    lugar de re-hashear cadenas en cada petición.
+    """
+    for dim in CATEGORICAL_DIMS:
+        col = mapping.get(dim)
+        if col and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype("category")
+
+
+def build_bin_index(df: pd.DataFrame, bin_col: str) -> tuple[np.ndarray, np.ndarray]:
+    """Construye el índice ordenado del BIN para filtrar prefijos en O(log N).
+
+    Devuelve `(valores_ordenados, orden)`, donde `orden` son las posiciones
+    originales de cada valor ordenado.
+    """
+    values = np.asarray(df[bin_col].fillna("").astype(str))
+    order = np.argsort(values, kind="stable")
+    return values[order], order
+
+
+def build_bin_int(
+    df: pd.DataFrame, bin_col: str
+) -> Optional[tuple[np.ndarray, np.ndarray, int]]:
+    """Representación numérica del BIN cuando todos los valores son dígitos.
+
+    Cada BIN se alinea a la izquierda multiplicando por 10^(ancho - longitud),
+    de modo que el filtro por prefijo se convierte en una comprobación de
+    rango entero (más la longitud mínima, para que `"2102"` no iguale al
+    prefijo `"21020"`). ~8 bytes por fila frente a los ~50 de un str.
+    Devuelve `(valores_alineados, longitudes, ancho)` o None si hay valores
+    no numéricos. La columna de texto se conserva para mostrarla.
+    """
+    s = df[bin_col].fillna("")
+    if len(s) == 0 or not s.str.fullmatch(r"\d{1,19}").all():
+        return None
+    lengths = s.str.len().to_numpy(dtype=np.int64)
+    width = int(lengths.max())
+    values = s.astype("uint64").to_numpy(dtype=np.uint64)
+    values = values * np.power(10, width - lengths).astype(np.uint64)
+    return values, lengths, width
+
+
+def build_first_occurrence(df: pd.DataFrame, bin_col: str) -> np.ndarray:
+    """Máscara de primeras apariciones de cada BIN, calculada una vez al cargar.
+
+    Con ella, `dedupe` parte de un conjunto de candidatos ya reducido en vez
+    de ejecutar `drop_duplicates` sobre el resultado filtrado.
+    """
+    return ~df.duplicated(subset=[bin_col], keep="first").to_numpy(dtype=bool)
+
+
+def build_search_blob(df: pd.DataFrame) -> pd.Series:
+    """Concatena todas las columnas en una sola serie en minúsculas.
+
+    La búsqueda libre pasa a ser un único `str.contains` sobre esta serie
+    en lugar de un escaneo por columna en cada petición.
+    """
+    blob = df[df.columns[0]].astype("string").fillna("")
+    for col in df.columns[1:]:
+        blob = blob.str.cat(df[col].astype("string").fillna(""), sep=" ")
+    return blob.str.lower()
+
+
+def build_prepaid_bool(df: pd.DataFrame, col: str) -> pd.Series:
+    """Normaliza la columna prepaid a una serie booleana (nullable) una vez.
+
+    Evita el `.map(parse_bool)` fila a fila en cada petición.
+    """
+    s = df[col].astype("string").str.strip().str.lower()
+    out = pd.Series(pd.NA, index=df.index, dtype="boolean")
+    out[s.isin(TRUE_VALUES)] = True
+    out[s.isin(FALSE_VALUES)] = False
+    return out
+
+
+def parse_bool(value) -> Optional[bool]:
+    """Interpreta valores tipo sí/no de columnas de texto. None si no se reconoce."""
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return None
+    text = str(value).strip().lower()
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    return None
+
+
+# Autómatas Aho-Corasick compilados por conjunto de términos; la compilación
+# solo se paga la primera vez que se ve cada consulta.
+_AUTOMATON_CACHE: "OrderedDict[tuple[str, ...], object]" = OrderedDict()
+_AUTOMATON_CACHE_MAX = 16
+
+
+def _automaton_for(terms: tuple[str, ...]):
+    automaton = _AUTOMATON_CACHE.get(terms)
+    if automaton is None:
+        automaton = ahocorasick.Automaton()
+        for idx, term in enumerate(terms):
+            automaton.add_word(term, idx)
+        automaton.make_automaton()
+        _AUTOMATON_CACHE[terms] = automaton
+        while len(_AUTOMATON_CACHE) > _AUTOMATON_CACHE_MAX:
+            _AUTOMATON_CACHE.popitem(last=False)
+    else:
+        _AUTOMATON_CACHE.move_to_end(terms)
+    return automaton
+
+
+def _multi_term_mask(search_blob: pd.Series, terms: list[str]) -> np.ndarray:
+    """Máscara de filas cuyo blob contiene todos los términos.
+
+    El autómata recorre cada fila una sola vez marcando qué términos
+    aparecen, en lugar de un pase de `str.contains` por término.
+    """
+    automaton = _automaton_for(tuple(terms))
+    needed = len(terms)
+    out = np.zeros(len(search_blob), dtype=bool)
+    for i, row in enumerate(search_blob.to_numpy()):
+        seen: set[int] = set()
+        for _, term_idx in automaton.iter(row):
+            seen.add(term_idx)
+            if len(seen) == needed:
+                out[i] = True
+                break
+    return out
+
+
+# Kernel JIT para el filtro de prefijo, compilado la primera vez que se usa.
+_PREFIX_KERNEL = None
+
+
+def _prefix_kernel():
+    global _PREFIX_KERNEL
+    if _PREFIX_KERNEL is None:
+
+        @numba.njit(parallel=True)
+        def kernel(offsets, data, prefix):
+            n = len(offsets) - 1
+            plen = len(prefix)
+            out = np.empty(n, dtype=np.bool_)
+            for i in numba.prange(n):
+                start = offsets[i]
+                if offsets[i + 1] - start < plen:
+                    out[i] = False
+                    continue
+                match = True
+                for j in range(plen):
+                    if data[start + j] != prefix[j]:
+                        match = False
+                        break
+                out[i] = match
+            return out
+
+        _PREFIX_KERNEL = kernel
+    return _PREFIX_KERNEL
+
+
+def _prefix_mask_numba(series: pd.Series, prefix: str) -> Optional[np.ndarray]:
+    """Filtro de prefijo como bucle JIT sobre los buffers Arrow de la columna.
+
+    Compara los primeros bytes de cada fila directamente sobre el buffer
+    contiguo de datos, sin pasar por objetos Python. Devuelve None si la
+    columna no está respaldada por Arrow o numba no está instalado.
+    """
+    if numba is None or pa is None:
+        return None
+    chunked = getattr(series.array, "_pa_array", None)
+    if chunked is None:
+        return None
+    arr = chunked.combine_chunks() if isinstance(chunked, pa.ChunkedArray) else chunked
+    if not (pa.types.is_string(arr.type) or pa.types.is_large_string(arr.type)):
+        return None
+    buffers = arr.buffers()
+    offsets_dtype = np.int64 if pa.types.is_large_string(arr.type) else np.int32
+    offsets = np.frombuffer(buffers[1], dtype=offsets_dtype)
+    offsets = offsets[arr.offset : arr.offset + len(arr) + 1]
+    data = np.frombuffer(buffers[2], dtype=np.uint8)
+    prefix_bytes = np.frombuffer(prefix.encode("utf-8"), dtype=np.uint8)
+    # Las filas nulas tienen longitud cero en los offsets, así que nunca
+    # igualan un prefijo no vacío (mismo comportamiento que fillna("")).
+    return _prefix_kernel()(offsets, data, prefix_bytes)
+
+
+def _isin_mask(series: pd.Series, values: list[str]) -> np.ndarray:
+    """Máscara `isin` como array numpy; con `category`, compara códigos enteros.
+
+    Los valores del filtro se traducen una sola vez a códigos con
+    `get_indexer`, y `np.isin(kind="table")` resuelve en O(N + M).
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.categories.get_indexer(values)
+        codes = codes[codes >= 0]
+        return np.isin(series.cat.codes.to_numpy(), codes, kind="table")
+    return pd.Index(series).isin(values)
+
+
+def filter_mask(
+    df: pd.DataFrame,
+    mapping: dict[str, Optional[str]],
+    *,
+    prefix: Optional[str] = None,
+    text: Optional[str] = None,
+    include: Optional[dict[str, list[str]]] = None,
+    exclude: Optional[dict[str, list[str]]] = None,
+    prepaid: Optional[bool] = None,
+    dedupe: bool = False,
+    bin_index: Optional[tuple[np.ndarray, np.ndarray]] = None,
+    bin_int: Optional[tuple[np.ndarray, np.ndarray, int]] = None,
+    search_blob: Optional[pd.Series] = None,
+    prepaid_bool: Optional[pd.Series] = None,
+    first_occurrence: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Calcula la máscara booleana de filas que pasan los filtros de la UI/API.
+
+    `include`/`exclude` son diccionarios dimensión -> lista de valores.
+    `bin_index` es el índice de `build_bin_index`; si se pasa, el filtro
+    por prefijo usa búsqueda binaria en lugar de recorrer la columna.
+    `bin_int` es la representación de `build_bin_int`; sin `bin_index`, un
+    prefijo numérico se resuelve como comprobación de rango entero.
+    `search_blob` es la serie de `build_search_blob`; si se pasa, la
+    búsqueda libre hace una sola pasada en lugar de una por columna.
+    `prepaid_bool` es la serie de `build_prepaid_bool`, ya normalizada.
+    `first_occurrence` es la máscara de `build_first_occurrence`; con
+    `dedupe` se queda la primera aparición de cada BIN en el dataset.
+    No modifica `df`.
+    """
+    include = include or {}
+    exclude = exclude or {}
+
+    bin_col = mapping.get("bin")
+
+    # Una sola máscara acumulada sobre `df`: cada filtro aporta un array
+    # booleano que se fusiona con AND, y solo al final se materializa un frame.
+    # Con `dedupe`, arrancar de las primeras apariciones reduce el conjunto
+    # de candidatos para todos los filtros posteriores.
+    if dedupe and bin_col:
+        if first_occurrence is not None:
+            mask = first_occurrence.copy()
+        else:
+            mask = ~df.duplicated(subset=[bin_col], keep="first").to_numpy(dtype=bool)
+    else:
+        mask = np.ones(len(df), dtype=bool)
+    if prefix and bin_col:
+        # Con prefijo numérico la comparación de rango sobre uint64 es más
+        # barata que la búsqueda binaria sobre cadenas, así que va primero.
+        if bin_int is not None and prefix.isdigit() and len(prefix) <= bin_int[2]:
+            values, lengths, width = bin_int
+            base = np.uint64(10 ** (width - len(prefix)))
+            lo_int = np.uint64(int(prefix)) * base
+            sub = (values >= lo_int) & (values < lo_int + base) & (lengths >= len(prefix))
+        elif bin_index is not None:
+            sorted_bins, order = bin_index
+            lo = np.searchsorted(sorted_bins, prefix, side="left")
+            hi = np.searchsorted(sorted_bins, prefix + "\uffff", side="right")
+            sub = np.zeros(len(df), dtype=bool)
+            sub[order[lo:hi]] = True
+        else:
+            sub = _prefix_mask_numba(df[bin_col], prefix)
+            if sub is None:
+                sub = np.asarray(
+                    df[bin_col].fillna("").str.startswith(prefix), dtype=bool
+                )
+        np.logical_and(mask, sub, out=mask)
+
+    for dim in LIST_DIMS:
+        col = mapping.get(dim)
+        if not col:
+            continue
+        values = include.get(dim)
+        if values:
+            np.logical_and(mask, _isin_mask(df[col], values), out=mask)
+        values = exclude.get(dim)
+        if values:
+            np.logical_and(mask, ~_isin_mask(df[col], values), out=mask)
+
+    prepaid_col = mapping.get("prepaid")
+    if prepaid is not None and prepaid_col:
+        if prepaid_bool is not None:
+            sub = (prepaid_bool == prepaid).fillna(False)
+        else:
+            s = df[prepaid_col].astype("string").str.strip().str.lower()
+            sub = s.isin(TRUE_VALUES if prepaid else FALSE_VALUES)
+        np.logical_and(mask, sub.to_numpy(dtype=bool), out=mask)
+
+    if text:
+        # Varios términos separados por espacios: la fila debe contenerlos
+        # todos. Con el autómata, el blob se recorre una sola vez por fila.
+        # Sin duplicados: add_word sobrescribe el índice de un término
+        # repetido y `len(seen) == needed` sería inalcanzable.
+        terms = list(dict.fromkeys(text.lower().split()))
+        if search_blob is not None and len(terms) > 1 and ahocorasick is not None:
+            sub = _multi_term_mask(search_blob, terms)
+        elif search_blob is not None:
+            sub = np.ones(len(df), dtype=bool)
+            for term in terms:
+                term_mask = search_blob.str.contains(term, regex=False, na=False)
+                np.logical_and(sub, term_mask.to_numpy(dtype=bool), out=sub)
+        else:
+            sub = np.ones(len(df), dtype=bool)
+            for term in terms:
+                term_mask = pd.Series(False, index=df.index)
+                for col in df.columns:
+                    term_mask |= df[col].str.contains(
+                        term, case=False, regex=False, na=False
+                    )
+                np.logical_and(sub, term_mask.to_numpy(dtype=bool), out=sub)
+        np.logical_and(mask, sub, out=mask)
+
+    return mask
+
+
+def apply_filters(df: pd.DataFrame, mapping: dict[str, Optional[str]], **kwargs) -> pd.DataFrame:
+    """Versión que materializa el frame filtrado; acepta los mismos argumentos
+    que `filter_mask`. Quien solo pagina debería usar `filter_mask` y
+    materializar únicamente la página."""
+    return df.iloc[np.flatnonzero(filter_mask(df, mapping, **kwargs))]
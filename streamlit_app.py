@@ -0,0 +1,113 @@
+"""Versión Streamlit de la aplicación de filtrado de BINs."""
+from __future__ import annotations
+
+import hashlib
+import io
+from pathlib import Path
+
+import pandas as pd
+import streamlit as st
+
+from app.utils import LIST_DIMS, apply_filters, detect_columns, read_csv
+
+DATA_PATH = Path(__file__).resolve().parent / "bin-list-data.csv"
+
+st.set_page_config(page_title="BIN Database Filter", layout="wide")
+
+
+# cache_resource comparte el DataFrame por referencia entre sesiones, sin el
+# pickle/unpickle de cache_data. Es seguro porque apply_filters no muta el df.
+@st.cache_resource(show_spinner=False)
+def cached_load(path: str) -> tuple[pd.DataFrame, str]:
+    return read_csv(path)
+
+
+# Para uploads el contenido varía por usuario; con el hash rápido de bytes,
+# subidas idénticas entre usuarios comparten el parseo cacheado.
+@st.cache_data(
+    show_spinner=False,
+    hash_funcs={bytes: lambda b: hashlib.blake2b(b, digest_size=8).hexdigest()},
+)
+def cached_parse(content: bytes) -> tuple[pd.DataFrame, str]:
+    return read_csv(io.BytesIO(content))
+
+
+# El frame filtrado llega con guion bajo (Streamlit no lo hashea); la clave de
+# cache es el tuple de filtros, así los reruns sin cambios no re-escanean.
+@st.cache_data(show_spinner=False)
+def cached_summaries(
+    filter_key: tuple, _filtered: pd.DataFrame, cols: tuple[str, ...]
+) -> dict[str, pd.Series]:
+    return {col: _filtered[col].value_counts().head(50) for col in cols}
+
+
+st.title("Filtro de bases de datos BIN/IIN")
+
+uploaded = st.sidebar.file_uploader("Sube tu CSV de BINs", type=["csv"])
+if uploaded is not None:
+    content = uploaded.getvalue()
+    df, encoding = cached_parse(content)
+    source = uploaded.name
+    # Huella del contenido: dos uploads con el mismo nombre y número de
+    # filas no deben compartir entradas de cache.
+    dataset_key = hashlib.blake2b(content, digest_size=8).hexdigest()
+elif DATA_PATH.exists():
+    df, encoding = cached_load(str(DATA_PATH))
+    source = DATA_PATH.name
+    dataset_key = str(DATA_PATH)
+else:
+    st.info("Sube un CSV para empezar.")
+    st.stop()
+
+mapping = detect_columns(df)
+st.sidebar.caption(f"{source} · {len(df):,} filas · {encoding}")
+
+prefix = st.sidebar.text_input("Prefijo de BIN")
+text = st.sidebar.text_input("Búsqueda libre")
+
+include: dict[str, list[str]] = {}
+for dim in LIST_DIMS:
+    col = mapping.get(dim)
+    if not col:
+        continue
+    options = sorted(df[col].dropna().unique().tolist())
+    selected = st.sidebar.multiselect(dim.replace("_", " ").title(), options)
+    if selected:
+        include[dim] = selected
+
+dedupe = st.sidebar.checkbox("Quitar BINs duplicados")
+
+filtered = apply_filters(
+    df,
+    mapping,
+    prefix=prefix or None,
+    text=text or None,
+    include=include,
+    dedupe=dedupe,
+)
+
+st.metric("Filas filtradas", f"{len(filtered):,}")
+st.dataframe(filtered, use_container_width=True, height=480)
+
+filter_key = (
+    dataset_key,
+    prefix,
+    text,
+    tuple(sorted((dim, tuple(vals)) for dim, vals in include.items())),
+    dedupe,
+)
+summary_dims = [(dim, mapping[dim]) for dim in ("brand", "type", "level") if mapping.get(dim)]
+summaries = cached_summaries(filter_key, filtered, tuple(col for _, col in summary_dims))
+
+summary_cols = st.columns(3)
+for slot, (dim, col) in zip(summary_cols, summary_dims):
+    with slot:
+        st.subheader(dim.title())
+        st.dataframe(summaries[col])
+
+st.download_button(
+    "Descargar CSV filtrado",
+    data=filtered.to_csv(index=False).encode("utf-8"),
+    file_name="bins_filtrados.csv",
+    mime="text/csv",
+)
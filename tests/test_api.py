@@ -0,0 +1,40 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app import api
+
+CSV = b"BIN,Brand,Other\n411111,VISA,9411\n510510,MASTERCARD,9510\n"
+
+
+@pytest.fixture
+def client():
+    return TestClient(api.app)
+
+
+def _upload(client, content=CSV, name="t.csv"):
+    return client.post("/upload", files={"file": (name, content, "text/csv")})
+
+
+def test_reupload_after_remap_restores_detected_mapping(client):
+    response = _upload(client)
+    assert response.json()["mapping"]["bin"] == "BIN"
+
+    client.post("/mapping", json={"bin": "Other"})
+    assert api.STORE.mapping["bin"] == "Other"
+
+    # El hit de cache debe restaurar el mapeo autodetectado, no el remapeado.
+    response = _upload(client)
+    assert response.json()["mapping"]["bin"] == "BIN"
+
+    response = client.get("/bins", params={"prefix": "41"})
+    assert response.json()["total"] == 1
+    response = client.get("/bins", params={"prefix": "94"})
+    assert response.json()["total"] == 0
+
+
+def test_remap_after_cache_hit_does_not_poison_cache(client):
+    _upload(client)
+    _upload(client)  # hit: STORE.mapping debe ser una copia
+    client.post("/mapping", json={"bin": "Other"})
+    response = _upload(client)
+    assert response.json()["mapping"]["bin"] == "BIN"
@@ -0,0 +1,126 @@
+import pandas as pd
+import pytest
+
+from app.utils import apply_filters, build_bin_index, detect_columns
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame(
+        {
+            "BIN": ["411111", "411112", "510510", "510510", "222300"],
+            "Brand": ["VISA", "VISA", "MASTERCARD", "MASTERCARD", "MASTERCARD"],
+            "Type": ["CREDIT", "DEBIT", "CREDIT", "CREDIT", "DEBIT"],
+            "Issuer": ["BANCO UNO", "BANCO UNO", "BANCO DOS", "BANCO DOS", None],
+        },
+        dtype="string",
+    )
+
+
+@pytest.fixture
+def mapping(df):
+    return detect_columns(df)
+
+
+def test_apply_filters_does_not_mutate_input(df, mapping):
+    original = df.copy(deep=True)
+    apply_filters(
+        df,
+        mapping,
+        prefix="41",
+        text="banco",
+        include={"brand": ["VISA"]},
+        exclude={"type": ["DEBIT"]},
+        dedupe=True,
+    )
+    pd.testing.assert_frame_equal(df, original)
+
+
+def test_apply_filters_without_filters_returns_everything(df, mapping):
+    assert len(apply_filters(df, mapping)) == len(df)
+
+
+def test_prefix_filter_matches_startswith(df, mapping):
+    result = apply_filters(df, mapping, prefix="41")
+    assert result["BIN"].tolist() == ["411111", "411112"]
+
+
+def test_prefix_filter_with_bin_index(df, mapping):
+    bin_index = build_bin_index(df, mapping["bin"])
+    result = apply_filters(df, mapping, prefix="5105", bin_index=bin_index)
+    assert result["BIN"].tolist() == ["510510", "510510"]
+
+
+def test_prefix_filter_with_bin_int(df, mapping):
+    from app.utils import build_bin_int
+
+    bin_int = build_bin_int(df, mapping["bin"])
+    assert bin_int is not None
+    result = apply_filters(df, mapping, prefix="41", bin_int=bin_int)
+    assert result["BIN"].tolist() == ["411111", "411112"]
+
+
+def test_bin_int_respects_shorter_bins(mapping):
+    from app.utils import build_bin_int
+
+    # "2102" alineado a la izquierda cae dentro del rango de "21020", pero
+    # el guard de longitudes debe descartarlo.
+    frame = pd.DataFrame({"BIN": ["2102", "21020000"]}, dtype="string")
+    frame_mapping = detect_columns(frame)
+    bin_int = build_bin_int(frame, frame_mapping["bin"])
+    result = apply_filters(frame, frame_mapping, prefix="21020", bin_int=bin_int)
+    assert result["BIN"].tolist() == ["21020000"]
+
+
+def test_build_bin_int_returns_none_for_non_numeric_bins():
+    from app.utils import build_bin_int
+
+    frame = pd.DataFrame({"BIN": ["41x", "44"]}, dtype="string")
+    assert build_bin_int(frame, "BIN") is None
+
+
+def test_include_exclude_and_dedupe(df, mapping):
+    result = apply_filters(
+        df, mapping, include={"brand": ["MASTERCARD"]}, dedupe=True
+    )
+    assert result["BIN"].tolist() == ["510510", "222300"]
+
+
+def test_text_filter_is_case_insensitive(df, mapping):
+    result = apply_filters(df, mapping, text="banco dos")
+    assert result["BIN"].tolist() == ["510510", "510510"]
+
+
+def test_text_filter_with_search_blob_matches_per_column_scan(df, mapping):
+    from app.utils import build_search_blob
+
+    blob = build_search_blob(df)
+    with_blob = apply_filters(df, mapping, text="Banco", search_blob=blob)
+    without = apply_filters(df, mapping, text="Banco")
+    pd.testing.assert_frame_equal(with_blob, without)
+
+
+def test_multi_term_text_requires_all_terms(df, mapping):
+    result = apply_filters(df, mapping, text="dos banco")
+    assert result["BIN"].tolist() == ["510510", "510510"]
+    assert len(apply_filters(df, mapping, text="banco visa")) == 2
+
+
+def test_multi_term_automaton_path_matches_fallback(df, mapping):
+    from app.utils import build_search_blob
+
+    blob = build_search_blob(df)
+    with_blob = apply_filters(df, mapping, text="dos banco", search_blob=blob)
+    without = apply_filters(df, mapping, text="dos banco")
+    pd.testing.assert_frame_equal(with_blob, without)
+    assert with_blob["BIN"].tolist() == ["510510", "510510"]
+
+
+def test_multi_term_with_duplicate_terms(df, mapping):
+    from app.utils import build_search_blob
+
+    blob = build_search_blob(df)
+    duplicated = apply_filters(df, mapping, text="banco dos banco", search_blob=blob)
+    plain = apply_filters(df, mapping, text="banco dos", search_blob=blob)
+    pd.testing.assert_frame_equal(duplicated, plain)
+    assert len(duplicated) == 2